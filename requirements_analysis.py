@@ -6,81 +6,271 @@ NetworkXによるゴール依存関係とコンポーネント依存関係の構
 """
 
 import networkx as nx
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # GUIバックエンドを読み込まずPNG出力のみ行う
 import matplotlib.pyplot as plt
+import hashlib
 import json
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# PNG出力解像度
+SAVE_DPI = 150
+
+# spring_layoutのパラメータ（レイアウトキャッシュ・生成物の再利用判定にも使用）
+GOAL_LAYOUT_KWARGS = {"k": 2, "iterations": 50, "seed": 42}
+COMPONENT_LAYOUT_KWARGS = {"k": 1.5, "iterations": 50, "seed": 42}
+
 # 日本語フォント設定
 plt.rcParams['font.sans-serif'] = ['MS Gothic', 'Yu Gothic', 'Meiryo', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
 
+# ゴール定義
+GOALS = {
+    "G0": "農地観測の\n意思決定支援",
+    "G1": "観測データを\n可視化",
+    "G2": "データの\n信頼性保証",
+    "G3": "使いやすい\nUI提供",
+
+    # レベル2
+    "G1.1": "衛星データを\n地図表示",
+    "G1.2": "平年値との\n比較分析",
+    "G1.3": "時系列\nグラフ表示",
+
+    "G2.1": "入力データ\n検証",
+    "G2.2": "セキュリティ\n脅威防御",
+    "G2.3": "データ整合性\n維持",
+
+    "G3.1": "直感的\n操作性",
+    "G3.2": "データ\nエクスポート",
+    "G3.3": "システム\n保守性",
+
+    # レベル3（主要な葉ゴール）
+    "G1.1.1": "LST表示",
+    "G1.1.2": "NDVI表示",
+    "G1.2.1": "最寄り観測所\n検索",
+    "G1.2.2": "平年値取得",
+    "G1.3.1": "3本線グラフ",
+
+    "G2.1.1": "座標範囲\nチェック",
+    "G2.1.2": "数値型強制",
+    "G2.1.3": "HTMLタグ除去",
+    "G2.2.1": "SQLi防御",
+    "G2.2.2": "XSS防御",
+    "G2.3.1": "外部キー制約",
+    "G2.3.2": "重複防止",
+}
+
+# ゴールの階層レベル（IDに含まれる'.'の数）
+LEVELS = {node_id: node_id.count('.') for node_id in GOALS}
+
+# ゴール精緻化関係（AND-精緻化）
+REFINEMENTS = [
+    # レベル0 → レベル1
+    ("G0", "G1"), ("G0", "G2"), ("G0", "G3"),
+
+    # レベル1 → レベル2
+    ("G1", "G1.1"), ("G1", "G1.2"), ("G1", "G1.3"),
+    ("G2", "G2.1"), ("G2", "G2.2"), ("G2", "G2.3"),
+    ("G3", "G3.1"), ("G3", "G3.2"), ("G3", "G3.3"),
+
+    # レベル2 → レベル3
+    ("G1.1", "G1.1.1"), ("G1.1", "G1.1.2"),
+    ("G1.2", "G1.2.1"), ("G1.2", "G1.2.2"),
+    ("G1.3", "G1.3.1"),
+
+    ("G2.1", "G2.1.1"), ("G2.1", "G2.1.2"), ("G2.1", "G2.1.3"),
+    ("G2.2", "G2.2.1"), ("G2.2", "G2.2.2"),
+    ("G2.3", "G2.3.1"), ("G2.3", "G2.3.2"),
+]
+
+# コンポーネントノード
+COMPONENTS = {
+    "User": "ユーザー",
+    "Browser": "Webブラウザ",
+    "Frontend": "フロントエンド",
+    "API": "バックエンドAPI",
+    "Database": "MySQL DB",
+    "Python": "Pythonスクリプト",
+    "JAXA": "JAXA G-Portal",
+    "JMA": "気象庁データ",
+}
+
+# 依存関係（矢印: A → B = "AがBに依存"）
+DEPENDENCIES = [
+    ("User", "Browser"),
+    ("Browser", "Frontend"),
+    ("Frontend", "API"),
+    ("API", "Database"),
+    ("Python", "JAXA"),
+    ("Python", "JMA"),
+    ("Python", "Database"),
+    ("API", "Python"),  # 間接依存
+]
+
+# 生成物と入力ハッシュの保存先
+OUTPUT_FILES = [
+    Path("goal_dependency_graph.png"),
+    Path("goal_dependency_graph.json"),
+    Path("component_dependency_graph.png"),
+]
+CACHE_HASH_PATH = Path(".cache_hash")
+GOAL_LAYOUT_PATH = Path("goal_layout.json")
+COMPONENT_LAYOUT_PATH = Path("component_layout.json")
+
+
+def dump_json(obj):
+    """整形済みJSONをUTF-8バイト列で返す（orjsonがあれば使用）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _inputs_fingerprint():
+    """ゴール・コンポーネント定義と描画パラメータのハッシュ値（生成物の再利用判定用）"""
+    payload = json.dumps([GOALS, REFINEMENTS, COMPONENTS, DEPENDENCIES,
+                          SAVE_DPI, GOAL_LAYOUT_KWARGS, COMPONENT_LAYOUT_KWARGS],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8")).hexdigest()
+
+
+def load_or_compute_layout(G, cache_path, **layout_kwargs):
+    """
+    spring_layoutの結果をJSONにキャッシュして再利用
+
+    キャッシュのノード・エッジ集合とレイアウトパラメータが現在と一致する場合のみ
+    読み込み、それ以外はspring_layoutを計算してキャッシュを書き直す。
+
+    Returns:
+        dict: ノード → 座標（np.ndarray）
+    """
+    edges = sorted([u, v] for u, v in G.edges())
+    if cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if (set(cached["pos"]) == set(G.nodes()) and cached["edges"] == edges
+                    and cached["layout_kwargs"] == layout_kwargs):
+                return {n: np.asarray(xy) for n, xy in cached["pos"].items()}
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    pos = nx.spring_layout(G, **layout_kwargs)
+    cache_data = {
+        "layout_kwargs": layout_kwargs,
+        "edges": edges,
+        "pos": {n: xy.tolist() for n, xy in pos.items()},
+    }
+    cache_path.write_text(json.dumps(cache_data, ensure_ascii=False), encoding="utf-8")
+    return pos
+
+
 def build_goal_dependency_graph():
     """KAOSゴール依存関係グラフの構築"""
     G = nx.DiGraph()
 
-    # ゴール定義
-    goals = {
-        "G0": "農地観測の\n意思決定支援",
-        "G1": "観測データを\n可視化",
-        "G2": "データの\n信頼性保証",
-        "G3": "使いやすい\nUI提供",
-
-        # レベル2
-        "G1.1": "衛星データを\n地図表示",
-        "G1.2": "平年値との\n比較分析",
-        "G1.3": "時系列\nグラフ表示",
-
-        "G2.1": "入力データ\n検証",
-        "G2.2": "セキュリティ\n脅威防御",
-        "G2.3": "データ整合性\n維持",
-
-        "G3.1": "直感的\n操作性",
-        "G3.2": "データ\nエクスポート",
-        "G3.3": "システム\n保守性",
-
-        # レベル3（主要な葉ゴール）
-        "G1.1.1": "LST表示",
-        "G1.1.2": "NDVI表示",
-        "G1.2.1": "最寄り観測所\n検索",
-        "G1.2.2": "平年値取得",
-        "G1.3.1": "3本線グラフ",
-
-        "G2.1.1": "座標範囲\nチェック",
-        "G2.1.2": "数値型強制",
-        "G2.1.3": "HTMLタグ除去",
-        "G2.2.1": "SQLi防御",
-        "G2.2.2": "XSS防御",
-        "G2.3.1": "外部キー制約",
-        "G2.3.2": "重複防止",
-    }
-
     # ノード追加
-    for node_id, label in goals.items():
-        level = node_id.count('.')
-        G.add_node(node_id, label=label, level=level)
+    G.add_nodes_from((node_id, {"label": label, "level": LEVELS[node_id]})
+                     for node_id, label in GOALS.items())
 
     # エッジ追加（AND-精緻化）
-    refinements = [
-        # レベル0 → レベル1
-        ("G0", "G1"), ("G0", "G2"), ("G0", "G3"),
-
-        # レベル1 → レベル2
-        ("G1", "G1.1"), ("G1", "G1.2"), ("G1", "G1.3"),
-        ("G2", "G2.1"), ("G2", "G2.2"), ("G2", "G2.3"),
-        ("G3", "G3.1"), ("G3", "G3.2"), ("G3", "G3.3"),
-
-        # レベル2 → レベル3
-        ("G1.1", "G1.1.1"), ("G1.1", "G1.1.2"),
-        ("G1.2", "G1.2.1"), ("G1.2", "G1.2.2"),
-        ("G1.3", "G1.3.1"),
-
-        ("G2.1", "G2.1.1"), ("G2.1", "G2.1.2"), ("G2.1", "G2.1.3"),
-        ("G2.2", "G2.2.1"), ("G2.2", "G2.2.2"),
-        ("G2.3", "G2.3.1"), ("G2.3", "G2.3.2"),
-    ]
-
-    G.add_edges_from(refinements)
-    return G, goals
+    G.add_edges_from(REFINEMENTS)
+
+    # 葉ゴール（実装可能なゴール）を一度だけ求めてグラフに保持
+    G.graph['leaves'] = frozenset(n for n, d in G.out_degree() if d == 0)
+    return G, GOALS
+
+
+def compute_pagerank(G, alpha=0.85, max_iter=100, tol=1.0e-6):
+    """
+    密な遷移行列のべき乗法によるPageRank計算
+
+    小規模グラフ（数十ノード）ではnx.pagerankの辞書操作よりも
+    NumPy行列積のほうが高速。結果はnx.pagerankと同じ定義に従う。
+
+    Returns:
+        dict: ノード → PageRankスコア
+    """
+    nodes = list(G.nodes())
+    N = len(nodes)
+    if N == 0:
+        return {}
+
+    A = nx.to_numpy_array(G, nodelist=nodes)
+    out_weight = A.sum(axis=1)
+
+    # 行正規化（出次数0のノードは全ノードへ均等に遷移）
+    dangling = out_weight == 0
+    A[dangling] = 1.0
+    out_weight[dangling] = N
+    M = (A / out_weight[:, None]).T
+
+    v = np.full(N, 1.0 / N)
+    for _ in range(max_iter):
+        v_prev = v
+        v = alpha * (M @ v) + (1.0 - alpha) / N
+        if np.abs(v - v_prev).sum() < N * tol:
+            break
+
+    return dict(zip(nodes, v.tolist()))
+
+
+def compute_betweenness(G):
+    """
+    重みなし有向グラフの媒介中心性（Brandesアルゴリズム）
+
+    ノードを整数インデックスに変換し、後続ノード配列を一度だけ構築して
+    各始点からのBFSと逆順の依存度集計を行う。
+    正規化はnx.betweenness_centralityと同じく 1/((n-1)(n-2))。
+
+    Returns:
+        dict: ノード → 媒介中心性
+    """
+    nodes = list(G.nodes())
+    N = len(nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    succ = [[index[m] for m in G.successors(n)] for n in nodes]
+
+    betweenness = np.zeros(N)
+    for s in range(N):
+        sigma = [0] * N
+        dist = [-1] * N
+        pred = [[] for _ in range(N)]
+        sigma[s] = 1
+        dist[s] = 0
+        stack = []
+        queue = [s]
+        head = 0
+        while head < len(queue):
+            v = queue[head]
+            head += 1
+            stack.append(v)
+            for w in succ[v]:
+                if dist[w] < 0:
+                    dist[w] = dist[v] + 1
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    sigma[w] += sigma[v]
+                    pred[w].append(v)
+
+        delta = [0.0] * N
+        while stack:
+            w = stack.pop()
+            coeff = (1.0 + delta[w]) / sigma[w]
+            for v in pred[w]:
+                delta[v] += sigma[v] * coeff
+            if w != s:
+                betweenness[w] += delta[w]
+
+    if N > 2:
+        betweenness /= (N - 1) * (N - 2)
+
+    return dict(zip(nodes, betweenness.tolist()))
 
 
 def analyze_goal_graph(G, goals):
@@ -105,7 +295,7 @@ def analyze_goal_graph(G, goals):
 
     # 3. 重要度分析（PageRank）
     print("--- 重要度分析（PageRank）Top 5 ---")
-    pagerank = nx.pagerank(G)
+    pagerank = compute_pagerank(G)
     sorted_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)
     for node, score in sorted_pagerank[:5]:
         label = goals[node].replace('\n', '')
@@ -114,19 +304,11 @@ def analyze_goal_graph(G, goals):
 
     # 4. クリティカルパス分析
     print("--- 最長依存パス（クリティカルパス）---")
-    leaf_nodes = [n for n in G.nodes() if G.out_degree(n) == 0]
+    # DAGなので全単純パスを列挙せず、トポロジカル順のDPで最長パスを求める（O(V+E)）
     root_node = "G0"
-    longest_path = []
-    max_length = 0
-    for leaf in leaf_nodes:
-        try:
-            paths = list(nx.all_simple_paths(G, root_node, leaf))
-            for path in paths:
-                if len(path) > max_length:
-                    max_length = len(path)
-                    longest_path = path
-        except nx.NetworkXNoPath:
-            continue
+    reachable = nx.descendants(G, root_node) | {root_node}
+    longest_path = nx.dag_longest_path(G.subgraph(reachable))
+    max_length = len(longest_path)
 
     print(f"パス長: {max_length - 1} (階層数: {max_length})")
     path_str = " → ".join([f"{n}" for n in longest_path])
@@ -135,7 +317,7 @@ def analyze_goal_graph(G, goals):
 
     # 5. ボトルネック分析（媒介中心性）
     print("--- ボトルネック分析（媒介中心性）Top 5 ---")
-    betweenness = nx.betweenness_centrality(G)
+    betweenness = compute_betweenness(G)
     sorted_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)
     for node, score in sorted_betweenness[:5]:
         if score > 0:
@@ -148,23 +330,20 @@ def analyze_goal_graph(G, goals):
 
 def visualize_goal_graph(G, goals):
     """ゴール依存関係グラフの可視化"""
-    plt.figure(figsize=(20, 14))
-    pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
+    fig = plt.figure(figsize=(20, 14))
+    ax = fig.add_axes((0, 0, 1, 1))
+    pos = load_or_compute_layout(G, GOAL_LAYOUT_PATH, **GOAL_LAYOUT_KWARGS)
 
     # レベル別色分け
     level_colors = {0: '#FF6B6B', 1: '#4ECDC4', 2: '#45B7D1', 3: '#96CEB4'}
-    node_colors = [level_colors[G.nodes[node]['level']] for node in G.nodes()]
-
-    nx.draw(G, pos,
-            labels={n: goals[n] for n in G.nodes()},
-            node_color=node_colors,
-            node_size=3000,
-            font_size=8,
-            font_weight='bold',
-            edge_color='gray',
-            arrows=True,
-            arrowsize=20,
-            arrowstyle='->')
+    node_colors = [level_colors[LEVELS[node]] for node in G.nodes()]
+
+    # nx.drawを経由せず描画プリミティブを直接呼ぶ
+    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=3000, ax=ax)
+    nx.draw_networkx_edges(G, pos, edge_color='gray', arrows=True, arrowsize=20,
+                           arrowstyle='->', node_size=3000, ax=ax)
+    nx.draw_networkx_labels(G, pos, labels={n: goals[n] for n in G.nodes()},
+                            font_size=8, font_weight='bold', ax=ax)
 
     plt.title("Satellite Data Viewer - KAOSゴール依存関係グラフ",
               fontsize=16, fontweight='bold', pad=20)
@@ -172,7 +351,8 @@ def visualize_goal_graph(G, goals):
     plt.tight_layout()
 
     output_path = Path("goal_dependency_graph.png")
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=SAVE_DPI, bbox_inches='tight')
+    plt.close(fig)
     print(f"[OK] グラフを {output_path} に保存しました")
 
     # JSONエクスポート
@@ -183,8 +363,7 @@ def visualize_goal_graph(G, goals):
     }
 
     json_path = Path("goal_dependency_graph.json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(graph_data, f, ensure_ascii=False, indent=2)
+    json_path.write_bytes(dump_json(graph_data))
     print(f"[OK] グラフデータを {json_path} に保存しました")
     print()
 
@@ -194,33 +373,12 @@ def build_component_dependency_graph():
     C = nx.DiGraph()
 
     # コンポーネントノード
-    components = {
-        "User": "ユーザー",
-        "Browser": "Webブラウザ",
-        "Frontend": "フロントエンド",
-        "API": "バックエンドAPI",
-        "Database": "MySQL DB",
-        "Python": "Pythonスクリプト",
-        "JAXA": "JAXA G-Portal",
-        "JMA": "気象庁データ",
-    }
-
-    C.add_nodes_from(components.keys())
+    C.add_nodes_from((node_id, {"label": label})
+                     for node_id, label in COMPONENTS.items())
 
     # 依存関係（矢印: A → B = "AがBに依存"）
-    dependencies = [
-        ("User", "Browser"),
-        ("Browser", "Frontend"),
-        ("Frontend", "API"),
-        ("API", "Database"),
-        ("Python", "JAXA"),
-        ("Python", "JMA"),
-        ("Python", "Database"),
-        ("API", "Python"),  # 間接依存
-    ]
-
-    C.add_edges_from(dependencies)
-    return C, components
+    C.add_edges_from(DEPENDENCIES)
+    return C, COMPONENTS
 
 
 def analyze_component_graph(C, components):
@@ -258,7 +416,8 @@ def analyze_component_graph(C, components):
 
     # 4. 単一障害点（SPOF）の識別
     print("--- 単一障害点（SPOF）分析 ---")
-    articulation_points = list(nx.articulation_points(C.to_undirected()))
+    # 隣接辞書をコピーしない無向ビューで関節点を求める
+    articulation_points = list(nx.articulation_points(C.to_undirected(as_view=True)))
     if articulation_points:
         print("以下のコンポーネントが停止すると、システムが分断されます:")
         for node in articulation_points:
@@ -271,18 +430,15 @@ def analyze_component_graph(C, components):
 
 def visualize_component_graph(C, components):
     """コンポーネント依存関係グラフの可視化"""
-    plt.figure(figsize=(12, 8))
-    pos = nx.spring_layout(C, k=1.5, iterations=50, seed=42)
-
-    nx.draw(C, pos,
-            labels=components,
-            node_color='lightblue',
-            node_size=4000,
-            font_size=10,
-            font_weight='bold',
-            edge_color='gray',
-            arrows=True,
-            arrowsize=20)
+    fig = plt.figure(figsize=(12, 8))
+    ax = fig.add_axes((0, 0, 1, 1))
+    pos = load_or_compute_layout(C, COMPONENT_LAYOUT_PATH, **COMPONENT_LAYOUT_KWARGS)
+
+    nx.draw_networkx_nodes(C, pos, node_color='lightblue', node_size=4000, ax=ax)
+    nx.draw_networkx_edges(C, pos, edge_color='gray', arrows=True, arrowsize=20,
+                           node_size=4000, ax=ax)
+    nx.draw_networkx_labels(C, pos, labels=components,
+                            font_size=10, font_weight='bold', ax=ax)
 
     plt.title("Satellite Data Viewer - コンポーネント依存関係グラフ",
               fontsize=14, fontweight='bold', pad=20)
@@ -290,7 +446,8 @@ def visualize_component_graph(C, components):
     plt.tight_layout()
 
     output_path = Path("component_dependency_graph.png")
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=SAVE_DPI, bbox_inches='tight')
+    plt.close(fig)
     print(f"[OK] コンポーネントグラフを {output_path} に保存しました")
     print()
 
@@ -303,7 +460,7 @@ def generate_traceability_matrix(G, goals):
     print()
 
     # 葉ゴール（実装可能なゴール）のみを抽出
-    leaf_goals = [n for n in G.nodes() if G.out_degree(n) == 0]
+    leaf_goals = G.graph.get('leaves') or {n for n, d in G.out_degree() if d == 0}
 
     # 実装ファイルとのマッピング
     implementation_map = {
@@ -341,15 +498,24 @@ def main():
     print("*" * 60)
     print()
 
+    # 入力・描画パラメータが前回実行時から変わっておらず生成物も揃っていれば描画しない
+    # （分析結果の表示は軽量なため毎回行う）
+    fingerprint = _inputs_fingerprint()
+    reuse_outputs = (CACHE_HASH_PATH.exists()
+                     and CACHE_HASH_PATH.read_text(encoding="utf-8").strip() == fingerprint
+                     and all(path.exists() for path in OUTPUT_FILES))
+
     # 1. ゴール依存関係グラフの分析
     G, goals = build_goal_dependency_graph()
     pagerank, betweenness = analyze_goal_graph(G, goals)
-    visualize_goal_graph(G, goals)
+    if not reuse_outputs:
+        visualize_goal_graph(G, goals)
 
     # 2. コンポーネント依存関係グラフの分析
     C, components = build_component_dependency_graph()
     analyze_component_graph(C, components)
-    visualize_component_graph(C, components)
+    if not reuse_outputs:
+        visualize_component_graph(C, components)
 
     # 3. トレーサビリティマトリクス生成
     generate_traceability_matrix(G, goals)
@@ -358,12 +524,17 @@ def main():
     print("分析完了")
     print("=" * 60)
     print()
-    print("生成されたファイル:")
-    print("  - goal_dependency_graph.png")
-    print("  - goal_dependency_graph.json")
-    print("  - component_dependency_graph.png")
+    if reuse_outputs:
+        print("[OK] 入力に変更がないため、既存の生成物を再利用しました:")
+    else:
+        print("生成されたファイル:")
+    for path in OUTPUT_FILES:
+        print(f"  - {path}")
     print()
 
+    if not reuse_outputs:
+        CACHE_HASH_PATH.write_text(fingerprint, encoding="utf-8")
+
 
 if __name__ == "__main__":
     main()
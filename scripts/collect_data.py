@@ -16,8 +16,11 @@ JAXA G-Portalから衛星データ（LST/NDVI）を取得し、JSON形式で出
 
 import argparse
 import json
+import math
 import os
 import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -27,9 +30,9 @@ load_dotenv()
 
 # Windows環境でのUTF-8出力設定
 if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    # codecsラッパーではなくreconfigureを使い、sys.stdout.buffer を利用可能なままにする
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
 
 # 必須ライブラリのインポート試行
 try:
@@ -46,6 +49,13 @@ except ImportError:
     H5PY_AVAILABLE = False
     print("⚠️  h5pyがインストールされていません", file=sys.stderr)
 
+# orjson（高速JSONシリアライザ）のインポート試行
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # gportal-python のインポート試行
 try:
     import gportal
@@ -58,6 +68,52 @@ except ImportError:
 DATA_DIR = Path(__file__).parent.parent / "data" / "jaxa_downloads"
 TEMP_DIR = Path(__file__).parent.parent / "data" / "temp"
 
+# モックデータ生成用の乱数シード
+MOCK_SEED = 42
+
+# モックHDF5データセットの格納設定（チャンク化 + LZF圧縮）
+MOCK_DATASET_OPTIONS = {
+    'chunks': (32, 32),
+    'compression': 'lzf',
+    'shuffle': True,
+}
+
+
+def _nan_to_none(obj):
+    """
+    NaN を None に置き換える（標準jsonでの出力をorjsonと揃えるため）
+
+    Args:
+        obj: 変換対象（dict / list / スカラー）
+
+    Returns:
+        NaN を None に置き換えたオブジェクト
+    """
+    if isinstance(obj, dict):
+        return {key: _nan_to_none(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_nan_to_none(value) for value in obj]
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def dump_json(obj):
+    """
+    整形済みJSONをUTF-8バイト列で返す（orjsonがあれば使用）
+
+    NaN はどちらの場合も null として出力する
+
+    Args:
+        obj: シリアライズ対象
+
+    Returns:
+        bytes: インデント2のJSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_nan_to_none(obj), indent=2, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
 
 def ensure_directories():
     """必要なディレクトリを作成"""
@@ -65,10 +121,13 @@ def ensure_directories():
     TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def get_gportal_credentials():
+def get_gportal_credentials(log=print):
     """
     G-Portal認証情報を取得
 
+    Args:
+        log: ログ出力関数（printと同じ呼び出し形式、デフォルトはprint）
+
     Returns:
         tuple: (username, password)
     """
@@ -76,22 +135,24 @@ def get_gportal_credentials():
     password = os.environ.get("GPORTAL_PASSWORD", "")
 
     if not username or not password:
-        print("\n⚠️  G-Portal認証情報が設定されていません", file=sys.stderr)
-        print("   環境変数 GPORTAL_USERNAME と GPORTAL_PASSWORD を設定してください", file=sys.stderr)
+        log("\n⚠️  G-Portal認証情報が設定されていません", file=sys.stderr)
+        log("   環境変数 GPORTAL_USERNAME と GPORTAL_PASSWORD を設定してください", file=sys.stderr)
         return None, None
 
     return username, password
 
 
-def search_and_download_real(lat, lon, target_date, product_type):
+def search_and_download_real(target_date, product_type, bbox, start_time, end_time, log=print):
     """
     実際のG-Portal APIでデータ検索・ダウンロード
 
     Args:
-        lat: 緯度
-        lon: 経度
         target_date: 対象日 (YYYY-MM-DD)
         product_type: プロダクトタイプ ("LST" or "NDVI")
+        bbox: 検索範囲 [西経度, 南緯度, 東経度, 北緯度]
+        start_time: 検索開始日時 (YYYY-MM-DDTHH:MM:SS)
+        end_time: 検索終了日時 (YYYY-MM-DDTHH:MM:SS)
+        log: ログ出力関数（printと同じ呼び出し形式、デフォルトはprint）
 
     Returns:
         ダウンロードしたファイルパス or None
@@ -101,7 +162,7 @@ def search_and_download_real(lat, lon, target_date, product_type):
 
     try:
         # 認証情報取得
-        username, password = get_gportal_credentials()
+        username, password = get_gportal_credentials(log)
         if not username or not password:
             return None
 
@@ -116,22 +177,16 @@ def search_and_download_real(lat, lon, target_date, product_type):
 
         dataset_id = dataset_mapping.get(product_type)
         if not dataset_id:
-            print(f"⚠️  未対応のプロダクトタイプ: {product_type}", file=sys.stderr)
+            log(f"⚠️  未対応のプロダクトタイプ: {product_type}", file=sys.stderr)
             return None
 
-        # バウンディングボックス設定（座標周辺 ±0.5度）
-        bbox = [lon - 0.5, lat - 0.5, lon + 0.5, lat + 0.5]
-
-        print(f"\n🔍 G-Portal検索: {product_type} ({target_date})")
-
-        # データ検索（±1日の範囲）
-        start_date = (datetime.fromisoformat(target_date) - timedelta(days=1)).date()
-        end_date = (datetime.fromisoformat(target_date) + timedelta(days=1)).date()
+        log(f"\n🔍 G-Portal検索: {product_type} ({target_date})")
 
+        # データ検索
         res = gportal.search(
             dataset_ids=dataset_id,
-            start_time=f"{start_date}T00:00:00",
-            end_time=f"{end_date}T23:59:59",
+            start_time=start_time,
+            end_time=end_time,
             bbox=bbox,
             params={}
         )
@@ -139,10 +194,10 @@ def search_and_download_real(lat, lon, target_date, product_type):
         products = list(res.products())
 
         if not products:
-            print(f"⚠️  該当するプロダクトが見つかりませんでした", file=sys.stderr)
+            log(f"⚠️  該当するプロダクトが見つかりませんでした", file=sys.stderr)
             return None
 
-        print(f"✓ {len(products)} 件のプロダクトが見つかりました")
+        log(f"✓ {len(products)} 件のプロダクトが見つかりました")
 
         # 認証情報設定
         gportal.username = username
@@ -150,22 +205,22 @@ def search_and_download_real(lat, lon, target_date, product_type):
 
         # 最初のプロダクトをダウンロード
         product = products[0]
-        print(f"\n📥 ダウンロード中: {product.id}")
+        log(f"\n📥 ダウンロード中: {product.id}")
 
         downloaded_files = gportal.download([product], local_dir=str(TEMP_DIR))
 
         if downloaded_files:
-            print(f"✓ ダウンロード完了: {downloaded_files[0]}")
+            log(f"✓ ダウンロード完了: {downloaded_files[0]}")
             return Path(downloaded_files[0])
 
         return None
 
     except Exception as e:
-        print(f"✗ G-Portal APIエラー: {e}", file=sys.stderr)
+        log(f"✗ G-Portal APIエラー: {e}", file=sys.stderr)
         return None
 
 
-def create_mock_hdf5(lat, lon, target_date, product_type):
+def create_mock_hdf5(lat, lon, target_date, product_type, log=print):
     """
     モックHDF5ファイルを作成
 
@@ -174,15 +229,16 @@ def create_mock_hdf5(lat, lon, target_date, product_type):
         lon: 経度
         target_date: 対象日
         product_type: プロダクトタイプ ("LST" or "NDVI")
+        log: ログ出力関数（printと同じ呼び出し形式、デフォルトはprint）
 
     Returns:
         モックファイルパス
     """
     if not H5PY_AVAILABLE or not NUMPY_AVAILABLE:
-        print("⚠️  h5pyまたはnumpyが必要です", file=sys.stderr)
+        log("⚠️  h5pyまたはnumpyが必要です", file=sys.stderr)
         return None
 
-    print(f"\n📥 モックデータ生成: {product_type} ({target_date})")
+    log(f"\n📥 モックデータ生成: {product_type} ({target_date})")
 
     date_str = target_date.replace('-', '')
     filename = f"GC1SG1_{date_str}01D01D_{product_type}_MOCK.h5"
@@ -196,44 +252,94 @@ def create_mock_hdf5(lat, lon, target_date, product_type):
             # 緯度・経度グリッド（100x100）
             lat_range = np.linspace(lat - 0.5, lat + 0.5, 100)
             lon_range = np.linspace(lon - 0.5, lon + 0.5, 100)
-            lon_grid, lat_grid = np.meshgrid(lon_range, lat_range)
+            # 分離可能な格子のため、meshgridで実体を作らずブロードキャストビューを書き込む
+            lat_grid = np.broadcast_to(lat_range[:, None], (100, 100))
+            lon_grid = np.broadcast_to(lon_range[None, :], (100, 100))
 
-            geo_group.create_dataset('Latitude', data=lat_grid)
-            geo_group.create_dataset('Longitude', data=lon_grid)
+            geo_group.create_dataset('Latitude', data=lat_grid, **MOCK_DATASET_OPTIONS)
+            geo_group.create_dataset('Longitude', data=lon_grid, **MOCK_DATASET_OPTIONS)
 
             # Image_dataグループ
             img_group = f.create_group('Image_data')
 
-            # データ生成
+            # データ生成（プロダクトごとに独立した乱数列を使い、並列生成でも再現可能にする）
+            rng = np.random.default_rng([MOCK_SEED, zlib.crc32(product_type.encode())])
             if product_type == 'LST':
                 # 地表面温度（Kelvin）
                 mean_value = 291.5  # 約18.35°C
                 std_value = 3.0
-                data = np.random.normal(mean_value, std_value, (100, 100))
-                data = np.clip(data, 273.0, 320.0)  # 0℃～47℃
+                data = rng.standard_normal((100, 100), dtype=np.float32) * std_value + mean_value
+                np.clip(data, 273.0, 320.0, out=data)  # 0℃～47℃
                 units = 'Kelvin'
                 description = 'Land Surface Temperature'
             else:  # NDVI
                 mean_value = 0.75
                 std_value = 0.08
-                data = np.random.normal(mean_value, std_value, (100, 100))
-                data = np.clip(data, 0.0, 1.0)
+                data = rng.standard_normal((100, 100), dtype=np.float32) * std_value + mean_value
+                np.clip(data, 0.0, 1.0, out=data)
                 units = 'dimensionless'
                 description = 'Normalized Difference Vegetation Index'
 
             # データセット作成
-            ds = img_group.create_dataset(product_type, data=data)
+            ds = img_group.create_dataset(product_type, data=data, dtype='f4',
+                                          **MOCK_DATASET_OPTIONS)
             ds.attrs['description'] = description
             ds.attrs['units'] = units
 
-        print(f"✓ モックファイル作成完了: {output_path}")
+        log(f"✓ モックファイル作成完了: {output_path}")
         return output_path
 
     except Exception as e:
-        print(f"✗ モックファイル作成エラー: {e}", file=sys.stderr)
+        log(f"✗ モックファイル作成エラー: {e}", file=sys.stderr)
         return None
 
 
+def find_nearest_pixel(lat_grid, lon_grid, lat, lon):
+    """
+    指定座標に最も近いピクセルのインデックスを取得
+
+    等間隔の緯度経度格子であれば格子間隔から直接インデックスを計算し（O(1)）、
+    そうでない場合のみ全ピクセルとのユークリッド距離で探索する
+
+    Args:
+        lat_grid: 緯度グリッド（2次元配列またはh5pyデータセット）
+        lon_grid: 経度グリッド（2次元配列またはh5pyデータセット）
+        lat: 緯度
+        lon: 経度
+
+    Returns:
+        tuple: (行インデックス, 列インデックス)
+    """
+    n_rows, n_cols = lat_grid.shape
+
+    if n_rows > 1 and n_cols > 1:
+        lat_axis = np.asarray(lat_grid[:, 0], dtype=np.float64)
+        lon_axis = np.asarray(lon_grid[0, :], dtype=np.float64)
+        lat0, lon0 = lat_axis[0], lon_axis[0]
+        dlat = (lat_axis[-1] - lat0) / (n_rows - 1)
+        dlon = (lon_axis[-1] - lon0) / (n_cols - 1)
+
+        is_uniform = (
+            dlat != 0 and dlon != 0
+            and np.allclose(np.diff(lat_axis), dlat)
+            and np.allclose(np.diff(lon_axis), dlon)
+            and np.isclose(lat_grid[0, n_cols - 1], lat0)
+            and np.isclose(lon_grid[n_rows - 1, 0], lon0)
+        )
+
+        if is_uniform:
+            i = int(np.clip(round((lat - lat0) / dlat), 0, n_rows - 1))
+            j = int(np.clip(round((lon - lon0) / dlon), 0, n_cols - 1))
+            return i, j
+
+    # 非等間隔グリッド: 全ピクセル探索
+    lat_values = np.asarray(lat_grid[()])
+    lon_values = np.asarray(lon_grid[()])
+    distances = np.sqrt((lat_values - lat)**2 + (lon_values - lon)**2)
+    i, j = np.unravel_index(np.argmin(distances), distances.shape)
+    return int(i), int(j)
+
+
 def extract_pixel_value(hdf5_path, lat, lon, dataset_name):
     """
     HDF5ファイルから指定座標のピクセル値を抽出
@@ -251,27 +357,26 @@ def extract_pixel_value(hdf5_path, lat, lon, dataset_name):
         return {"error": "h5pyまたはnumpyが必要です"}
 
     try:
-        with h5py.File(hdf5_path, 'r') as f:
+        # チャンクキャッシュを拡張し、必要な領域のみ読み込む
+        with h5py.File(hdf5_path, 'r', rdcc_nbytes=16 << 20) as f:
             # データセットパス
             data_path = f'Image_data/{dataset_name}'
 
             if data_path not in f:
                 return {"error": f"データセット {data_path} が見つかりません"}
 
-            # データ読み込み
+            # データセット取得（全体は読み込まない）
             dataset = f[data_path]
-            data = dataset[:]
 
             # 緯度経度グリッド取得
-            lat_grid = f['Geometry_data/Latitude'][:]
-            lon_grid = f['Geometry_data/Longitude'][:]
+            lat_grid = f['Geometry_data/Latitude']
+            lon_grid = f['Geometry_data/Longitude']
 
             # 最も近いピクセルのインデックスを取得
-            distances = np.sqrt((lat_grid - lat)**2 + (lon_grid - lon)**2)
-            min_idx = np.unravel_index(np.argmin(distances), distances.shape)
+            min_idx = find_nearest_pixel(lat_grid, lon_grid, lat, lon)
 
             # ピクセル値取得
-            pixel_value = float(data[min_idx])
+            pixel_value = float(dataset[min_idx])
 
             # 温度の場合はKelvinから摂氏に変換
             if dataset_name == 'LST':
@@ -283,19 +388,19 @@ def extract_pixel_value(hdf5_path, lat, lon, dataset_name):
             i, j = min_idx
             window_size = 5
             i_start = max(0, i - window_size // 2)
-            i_end = min(data.shape[0], i + window_size // 2 + 1)
+            i_end = min(dataset.shape[0], i + window_size // 2 + 1)
             j_start = max(0, j - window_size // 2)
-            j_end = min(data.shape[1], j + window_size // 2 + 1)
+            j_end = min(dataset.shape[1], j + window_size // 2 + 1)
 
-            window_data = data[i_start:i_end, j_start:j_end]
-            window_data_clean = window_data[~np.isnan(window_data)]
+            window_data = dataset[i_start:i_end, j_start:j_end]
 
-            if len(window_data_clean) > 0:
+            # 欠損値（NaN）を除外した統計（マスク配列を作らずNaN対応関数で集計）
+            if not np.isnan(window_data).all():
                 window_stats = {
-                    "mean": float(np.mean(window_data_clean)),
-                    "std": float(np.std(window_data_clean)),
-                    "min": float(np.min(window_data_clean)),
-                    "max": float(np.max(window_data_clean))
+                    "mean": float(np.nanmean(window_data)),
+                    "std": float(np.nanstd(window_data)),
+                    "min": float(np.nanmin(window_data)),
+                    "max": float(np.nanmax(window_data))
                 }
 
                 # LSTの場合は摂氏も追加
@@ -325,6 +430,65 @@ def extract_pixel_value(hdf5_path, lat, lon, dataset_name):
         return {"error": f"データ抽出エラー: {e}"}
 
 
+def _collect_one(lat, lon, target_date, product_type, use_mock, search_params):
+    """
+    1プロダクト分のファイル取得とピクセル値抽出（ワーカースレッドで実行）
+
+    ログは出力が混ざらないよう溜めておき、呼び出し側でまとめて出力する
+
+    Args:
+        lat: 緯度
+        lon: 経度
+        target_date: 対象日 (YYYY-MM-DD)
+        product_type: プロダクトタイプ ("LST" or "NDVI")
+        use_mock: モックモードを使用するか
+        search_params: G-Portal検索条件（bbox, start_time, end_time）。モック時・観測日不正時はNone
+
+    Returns:
+        tuple: (観測データのキー, 観測データ辞書, ログのリスト)
+    """
+    logs = []
+
+    def log(*args, **kwargs):
+        logs.append((args, kwargs))
+
+    log(f"\n{'='*70}")
+    log(f"データ取得: {product_type}")
+    log(f"{'='*70}")
+
+    # ファイル取得（実APIまたはモック）
+    if use_mock or not GPORTAL_AVAILABLE:
+        hdf5_path = create_mock_hdf5(lat, lon, target_date, product_type, log=log)
+    elif search_params is None:
+        # 観測日が解析できず検索条件を作れなかった
+        hdf5_path = None
+    else:
+        hdf5_path = search_and_download_real(target_date, product_type, log=log, **search_params)
+
+    if hdf5_path and hdf5_path.exists():
+        # ピクセル値抽出
+        log(f"\n📊 データ抽出中...")
+        extraction = extract_pixel_value(hdf5_path, lat, lon, product_type)
+
+        if "error" not in extraction:
+            observation = extraction
+            log(f"✓ {product_type} 取得成功")
+
+            # LSTの場合は摂氏表示
+            if product_type == "LST" and "pixel_value_celsius" in extraction:
+                log(f"   値: {extraction['pixel_value_celsius']:.2f}°C")
+            else:
+                log(f"   値: {extraction['pixel_value']:.3f}")
+        else:
+            observation = {"error": extraction["error"]}
+            log(f"⚠️  {product_type} 抽出失敗: {extraction['error']}", file=sys.stderr)
+    else:
+        observation = {"error": "ファイル取得失敗"}
+        log(f"⚠️  {product_type} ファイル取得失敗", file=sys.stderr)
+
+    return product_type.lower(), observation, logs
+
+
 def collect_satellite_data(lat, lon, target_date, use_mock=False):
     """
     衛星データを収集
@@ -350,38 +514,35 @@ def collect_satellite_data(lat, lon, target_date, use_mock=False):
         "observations": {}
     }
 
-    # LST（地表面温度）とNDVI（植生指標）を取得
-    for product_type in ["LST", "NDVI"]:
-        print(f"\n{'='*70}")
-        print(f"データ取得: {product_type}")
-        print(f"{'='*70}")
+    # G-Portal検索条件はプロダクト共通のため一度だけ計算
+    # バウンディングボックス（座標周辺 ±0.5度）と対象日±1日の検索期間
+    search_params = None
+    if not use_mock and GPORTAL_AVAILABLE:
+        try:
+            day = datetime.fromisoformat(target_date)
+            search_params = {
+                "bbox": [lon - 0.5, lat - 0.5, lon + 0.5, lat + 0.5],
+                "start_time": f"{(day - timedelta(days=1)).date()}T00:00:00",
+                "end_time": f"{(day + timedelta(days=1)).date()}T23:59:59",
+            }
+        except ValueError as e:
+            # 各プロダクトは取得失敗として記録し、結果JSONは出力する
+            print(f"⚠️  観測日の形式が不正です（YYYY-MM-DD）: {e}", file=sys.stderr)
 
-        # ファイル取得（実APIまたはモック）
-        if use_mock or not GPORTAL_AVAILABLE:
-            hdf5_path = create_mock_hdf5(lat, lon, target_date, product_type)
-        else:
-            hdf5_path = search_and_download_real(lat, lon, target_date, product_type)
-
-        if hdf5_path and hdf5_path.exists():
-            # ピクセル値抽出
-            print(f"\n📊 データ抽出中...")
-            extraction = extract_pixel_value(hdf5_path, lat, lon, product_type)
-
-            if "error" not in extraction:
-                result["observations"][product_type.lower()] = extraction
-                print(f"✓ {product_type} 取得成功")
-
-                # LSTの場合は摂氏表示
-                if product_type == "LST" and "pixel_value_celsius" in extraction:
-                    print(f"   値: {extraction['pixel_value_celsius']:.2f}°C")
-                else:
-                    print(f"   値: {extraction['pixel_value']:.3f}")
-            else:
-                result["observations"][product_type.lower()] = {"error": extraction["error"]}
-                print(f"⚠️  {product_type} 抽出失敗: {extraction['error']}", file=sys.stderr)
-        else:
-            result["observations"][product_type.lower()] = {"error": "ファイル取得失敗"}
-            print(f"⚠️  {product_type} ファイル取得失敗", file=sys.stderr)
+    # LST（地表面温度）とNDVI（植生指標）を並列に取得
+    # 各プロダクトの処理はネットワーク・HDF5 I/O待ちが支配的なためスレッドで重ねる
+    product_types = ["LST", "NDVI"]
+
+    def collect(product_type):
+        return _collect_one(lat, lon, target_date, product_type, use_mock, search_params)
+
+    with ThreadPoolExecutor(max_workers=len(product_types)) as executor:
+        for key, observation, logs in executor.map(collect, product_types):
+            result["observations"][key] = observation
+
+            # ワーカー内で溜めたログをプロダクト順に出力
+            for args, kwargs in logs:
+                print(*args, **kwargs)
 
     return result
 
@@ -424,12 +585,16 @@ def main():
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    # シリアライズは一度だけ行い、ファイル保存と標準出力で共有
+    payload = dump_json(result)
+    output_path.write_bytes(payload)
 
     print(f"\n✓ 結果をJSON形式で保存しました: {output_path}")
     print("\n📄 収集データ概要:")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    # 文字列に戻さずバイト列のまま書き出す（テキスト層のバッファを先に吐き出す）
+    sys.stdout.flush()
+    sys.stdout.buffer.write(payload)
+    sys.stdout.buffer.write(b"\n")
 
     print("\n" + "=" * 70)
     print("✓ 処理完了")
@@ -13,52 +13,150 @@ collect_data.py が出力したJSONファイルをMySQLにアップロード
 
 使用方法:
     python scripts/upload_to_mysql.py --input data.json --location-id 1
+    python scripts/upload_to_mysql.py --input data/*.json data/archive/ --location-id 1
+    find data -name '*.json' | python scripts/upload_to_mysql.py --daemon --location-id 1
 """
 
 import argparse
 import csv
+import functools
+import glob
 import json
+import logging
+import math
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
-# .envファイルから環境変数を読み込み
-load_dotenv()
-
 # Windows環境でのUTF-8出力設定
 if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    sys.stdout.reconfigure(encoding='utf-8')
+    sys.stderr.reconfigure(encoding='utf-8')
+
+logger = logging.getLogger(__name__)
 
-# MySQL接続ライブラリのインポート試行
+# MySQL接続ライブラリ（--backup-only では不要なため import_mysql_driver() で遅延インポート）
+MySQLdb = None
+MYSQL_DRIVER = None
+
+# ijson（ストリーミングJSONパーサ）のインポート試行
+# C拡張（yajl2_c）が利用可能な場合は自動的に選択される
 try:
-    import pymysql
-    pymysql.install_as_MySQLdb()
-    PYMYSQL_AVAILABLE = True
+    import ijson
+    IJSON_AVAILABLE = True
 except ImportError:
-    PYMYSQL_AVAILABLE = False
-    print("⚠️  pymysqlがインストールされていません", file=sys.stderr)
-    print("   pip install pymysql でインストールしてください", file=sys.stderr)
+    IJSON_AVAILABLE = False
+
+# 外部キー制約違反のMySQLエラー番号（ER_NO_REFERENCED_ROW_2）
+FK_VIOLATION_ERRNO = 1452
+
+# 接続断を示すMySQLクライアントエラー番号（CR_SERVER_GONE_ERROR, CR_SERVER_LOST）
+CONNECTION_LOST_ERRNOS = (2006, 2013)
+
+# observations へのINSERT文（全行で共通）
+# executemanyの一括書き換えを有効にするため、
+# VALUES句は %s のみ、ON DUPLICATE句は VALUES(col) で参照する
+INSERT_OBSERVATIONS_SQL = """
+    INSERT INTO observations (
+        location_id,
+        observation_date,
+        lst,
+        ndvi
+    ) VALUES (
+        %s, %s, %s, %s
+    )
+    ON DUPLICATE KEY UPDATE
+        lst = VALUES(lst),
+        ndvi = VALUES(ndvi)
+"""
+
+# JSONファイルを並列に読み込む最大スレッド数
+MAX_LOAD_WORKERS = 32
+
+# orjson（高速JSONパーサ）のインポート試行
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # バックアップディレクトリ
 BACKUP_DIR = Path(__file__).parent.parent / "data" / "backup"
 
+# CSVバックアップの列
+BACKUP_FIELDNAMES = ['location_id', 'observation_date', 'lst', 'ndvi', 'error']
+
+
+def configure_logging(quiet=False):
+    """
+    ログ出力を設定（INFOは標準出力、WARNING以上は標準エラー出力）
+
+    Args:
+        quiet: Trueの場合はWARNING以上のみ出力
+    """
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.WARNING)
+
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.WARNING)
+
+    logging.basicConfig(
+        level=logging.WARNING if quiet else logging.INFO,
+        format='%(message)s',
+        handlers=[stdout_handler, stderr_handler],
+    )
+
+
+def import_mysql_driver():
+    """
+    MySQL接続ライブラリをインポート（初回呼び出し時のみ）
+
+    C拡張の mysqlclient (MySQLdb) を優先し、無ければ互換APIの pymysql を使う
+
+    Returns:
+        bool: ライブラリが利用可能かどうか
+    """
+    global MySQLdb, MYSQL_DRIVER
+
+    if MYSQL_DRIVER is not None:
+        return True
+
+    try:
+        import MySQLdb
+        import MySQLdb.cursors
+        MYSQL_DRIVER = 'mysqlclient'
+    except ImportError:
+        try:
+            import pymysql as MySQLdb
+            MYSQL_DRIVER = 'pymysql'
+        except ImportError:
+            logger.warning("⚠️  mysqlclientがインストールされていません")
+            logger.warning("   pip install mysqlclient でインストールしてください")
+            return False
+
+    return True
+
 
 def ensure_backup_directory():
     """バックアップディレクトリを作成"""
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
 def get_mysql_config():
     """
-    .envファイルからMySQL接続情報を取得
+    .envファイルからMySQL接続情報を取得（プロセス内で一度だけ構築）
 
     Returns:
         dict: MySQL接続設定
     """
+    # .envファイルから環境変数を読み込み（接続情報が環境変数で与えられていればファイルI/Oを省略）
+    if not (os.environ.get('MYSQL_HOST') and os.environ.get('MYSQL_PASSWORD')):
+        from dotenv import load_dotenv
+        load_dotenv()
+
     config = {
         'host': os.environ.get('MYSQL_HOST', 'localhost'),
         'user': os.environ.get('MYSQL_USER', 'root'),
@@ -70,12 +168,12 @@ def get_mysql_config():
 
     # 必須項目チェック
     if not config['password']:
-        print("\n⚠️  MySQL接続情報が不完全です", file=sys.stderr)
-        print("   .envファイルに以下を設定してください:", file=sys.stderr)
-        print("   - MYSQL_HOST", file=sys.stderr)
-        print("   - MYSQL_USER", file=sys.stderr)
-        print("   - MYSQL_PASSWORD", file=sys.stderr)
-        print("   - MYSQL_DATABASE", file=sys.stderr)
+        logger.warning("\n⚠️  MySQL接続情報が不完全です")
+        logger.warning("   .envファイルに以下を設定してください:")
+        logger.warning("   - MYSQL_HOST")
+        logger.warning("   - MYSQL_USER")
+        logger.warning("   - MYSQL_PASSWORD")
+        logger.warning("   - MYSQL_DATABASE")
 
     return config
 
@@ -90,28 +188,121 @@ def connect_to_mysql(config):
     Returns:
         connection: MySQL接続オブジェクト
     """
-    if not PYMYSQL_AVAILABLE:
-        raise ImportError("pymysqlがインストールされていません")
+    if not import_mysql_driver():
+        raise ImportError("mysqlclientがインストールされていません")
+
+    # TCP_NODELAY はどちらのドライバも接続時に設定済みのため指定不要
+    options = {
+        'connect_timeout': 5,
+        'read_timeout': 30,
+        'write_timeout': 30,
+    }
+    # プロトコル圧縮は mysqlclient のみ対応（pymysqlは未実装）
+    if MYSQL_DRIVER == 'mysqlclient':
+        options['compress'] = True
 
     try:
-        connection = pymysql.connect(
+        connection = MySQLdb.connect(
             host=config['host'],
             user=config['user'],
             password=config['password'],
             database=config['database'],
             port=config['port'],
             charset=config['charset'],
-            cursorclass=pymysql.cursors.DictCursor
+            cursorclass=MySQLdb.cursors.DictCursor,
+            # バッチ単位でCOMMIT/ROLLBACKするため自動コミットは無効
+            autocommit=False,
+            **options
         )
 
-        print(f"✓ MySQL接続成功: {config['user']}@{config['host']}:{config['port']}/{config['database']}")
+        logger.info(f"✓ MySQL接続成功: {config['user']}@{config['host']}:{config['port']}/{config['database']}")
         return connection
 
-    except pymysql.Error as e:
-        print(f"✗ MySQL接続エラー: {e}", file=sys.stderr)
+    except MySQLdb.Error as e:
+        logger.error(f"✗ MySQL接続エラー: {e}")
         raise
 
 
+def is_connection_lost(error):
+    """
+    MySQLエラーが接続断によるものか判定
+
+    Args:
+        error: MySQLエラー
+
+    Returns:
+        bool: 接続断かどうか
+    """
+    return bool(error.args) and error.args[0] in CONNECTION_LOST_ERRNOS
+
+
+def close_quietly(connection):
+    """
+    MySQL接続を閉じる（未接続・切断済みで失敗しても無視）
+
+    Args:
+        connection: MySQL接続（Noneの場合は何もしない）
+    """
+    if connection is None:
+        return
+
+    try:
+        connection.close()
+    except MySQLdb.Error:
+        pass
+
+
+def is_connection_alive(connection):
+    """
+    接続が利用可能かpingで確認
+
+    Args:
+        connection: MySQL接続（前回の再接続に失敗した場合はNone）
+
+    Returns:
+        bool: 利用可能かどうか（None・切断済み・閉じられた接続はFalse）
+    """
+    if connection is None:
+        return False
+
+    try:
+        connection.ping()
+        return True
+    except MySQLdb.OperationalError as e:
+        if not is_connection_lost(e):
+            raise
+        logger.warning(f"⚠️  MySQL接続が切断されています。再接続します: {e}")
+    except MySQLdb.Error as e:
+        # 閉じられた接続（mysqlclientはInterfaceError、pymysqlは "Already closed" のError）
+        logger.warning(f"⚠️  MySQL接続が閉じられています。再接続します: {e}")
+
+    return False
+
+
+def resolve_input_paths(inputs):
+    """
+    --input で指定されたファイル・ディレクトリ・globパターンを展開
+
+    Args:
+        inputs: 入力指定のリスト
+
+    Returns:
+        list: JSONファイルパスのリスト（重複除去済み、指定順）
+    """
+    paths = []
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(sorted(path.glob('*.json')))
+        elif glob.has_magic(item):
+            paths.extend(Path(p) for p in sorted(glob.glob(item)))
+        else:
+            paths.append(path)
+
+    return list(dict.fromkeys(paths))
+
+
 def load_json_data(json_path):
     """
     JSONファイルを読み込む
@@ -127,17 +318,41 @@ def load_json_data(json_path):
     if not json_path.exists():
         raise FileNotFoundError(f"JSONファイルが見つかりません: {json_path}")
 
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # バイト列のまま渡し、テキストI/O層でのデコードを省く（UTF-8はパーサ側で判定）
+    raw = json_path.read_bytes()
+    try:
+        data = json_loads(raw)
+    except ValueError:
+        # orjsonは NaN 等の非標準トークン（旧collect_data.pyの出力）を受け付けないため標準jsonで読み直す
+        if json_loads is json.loads:
+            raise
+        data = json.loads(raw)
 
-    print(f"✓ JSONファイル読み込み成功: {json_path}")
     return data
 
 
+def nan_to_none(value):
+    """
+    NaN を None（取得失敗）として扱う
+
+    Args:
+        value: 観測値
+
+    Returns:
+        観測値（NaNの場合はNone）
+    """
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
 def extract_observation_data(json_data):
     """
     JSONデータから観測データを抽出
 
+    値の丸めは行わず、observationsテーブルのDECIMAL列
+    （lst: DECIMAL(5,2), ndvi: DECIMAL(5,3)）への格納時にMySQLが行う
+
     Args:
         json_data: collect_data.py が出力したJSONデータ
 
@@ -154,104 +369,265 @@ def extract_observation_data(json_data):
     if 'observations' in json_data and 'lst' in json_data['observations']:
         lst_data = json_data['observations']['lst']
         if 'error' not in lst_data and 'pixel_value_celsius' in lst_data:
-            observation['lst'] = round(lst_data['pixel_value_celsius'], 2)
+            observation['lst'] = nan_to_none(lst_data['pixel_value_celsius'])
 
     # NDVIデータ抽出
     if 'observations' in json_data and 'ndvi' in json_data['observations']:
         ndvi_data = json_data['observations']['ndvi']
         if 'error' not in ndvi_data and 'pixel_value' in ndvi_data:
-            observation['ndvi'] = round(ndvi_data['pixel_value'], 3)
+            observation['ndvi'] = nan_to_none(ndvi_data['pixel_value'])
 
     return observation
 
 
-def insert_observation(connection, location_id, observation):
+def extract_from_stream(json_path):
     """
-    observations テーブルにデータを挿入
+    JSONファイルをストリーム解析して観測データを抽出
+
+    ドキュメント全体を読み込まず、必要な3項目が揃った時点で解析を打ち切る
 
     Args:
-        connection: MySQL接続
+        json_path: JSONファイルパス
+
+    Returns:
+        dict: 観測データ（observation_date, lst, ndvi）
+    """
+    json_path = Path(json_path)
+
+    if not json_path.exists():
+        raise FileNotFoundError(f"JSONファイルが見つかりません: {json_path}")
+
+    observation = {
+        'observation_date': None,
+        'lst': None,
+        'ndvi': None
+    }
+
+    # 抽出対象のプレフィックス → 観測データのキー
+    targets = {
+        'observation_date': 'observation_date',
+        'observations.lst.pixel_value_celsius': 'lst',
+        'observations.ndvi.pixel_value': 'ndvi',
+    }
+    # エラーが記録されたプロダクトは値を採用しない
+    error_prefixes = {
+        'observations.lst.error': 'lst',
+        'observations.ndvi.error': 'ndvi',
+    }
+    remaining = set(targets.values())
+
+    with open(json_path, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix in targets and event in ('string', 'number'):
+                key = targets[prefix]
+                if key in remaining:
+                    observation[key] = float(value) if event == 'number' else value
+                    remaining.discard(key)
+            elif prefix in error_prefixes:
+                key = error_prefixes[prefix]
+                observation[key] = None
+                remaining.discard(key)
+
+            if not remaining:
+                break
+
+    return observation
+
+
+def load_observation(json_path):
+    """
+    JSONファイルから観測データを読み込む（ijsonがあればストリーム解析）
+
+    Args:
+        json_path: JSONファイルパス
+
+    Returns:
+        dict: 観測データ（observation_date, lst, ndvi）
+    """
+    if IJSON_AVAILABLE:
+        try:
+            return extract_from_stream(json_path)
+        except ijson.JSONError:
+            # NaN 等の非標準トークンを含むファイルは全体を読み込んで解析し直す
+            pass
+    return extract_observation_data(load_json_data(json_path))
+
+
+def drop_undated_observations(observations):
+    """
+    観測日が取得できなかった観測データを破棄
+
+    観測日の無い行はアップロードもCSVからの再取り込みもできないため、
+    ログに記録するのみとする
+
+    Args:
+        observations: 観測データのリスト
+
+    Returns:
+        list: 観測日のある観測データのリスト
+    """
+    dated = [observation for observation in observations if observation['observation_date'] is not None]
+
+    if len(dated) < len(observations):
+        logger.warning(f"⚠️  観測日（observation_date）が取得できないため {len(observations) - len(dated)} 件を破棄します")
+
+    return dated
+
+
+def filter_observations(observations):
+    """
+    アップロード対象の観測データを選別
+
+    LST・NDVIともに取得できなかった観測データはINSERTしても
+    NULLのみの行となるため、アップロード対象から除外する
+    （観測日の無い観測データは事前に drop_undated_observations で破棄しておく）
+
+    Args:
+        observations: 観測データのリスト
+
+    Returns:
+        tuple: (アップロード対象のリスト, 除外した観測データのリスト)
+    """
+    targets = []
+    skipped = []
+
+    for observation in observations:
+        if observation['lst'] is None and observation['ndvi'] is None:
+            skipped.append(observation)
+        else:
+            targets.append(observation)
+
+    return targets, skipped
+
+
+def exit_if_discarded(discarded):
+    """
+    読み込めなかったファイルや破棄した観測データがあれば終了コード1で終了
+    （cron等で失敗を検知できるようにする）
+
+    Args:
+        discarded: 読み込めなかったファイル・破棄した観測データの数
+    """
+    if discarded:
+        logger.error(f"\n✗ {discarded} 件の観測データを読み込めなかった、または破棄しました")
+        sys.exit(1)
+
+
+def backup_skipped_observations(skipped, location_id):
+    """
+    アップロード対象から除外した観測データをCSVバックアップに保存
+
+    Args:
+        skipped: 除外した観測データのリスト
         location_id: 観測地点ID
-        observation: 観測データ
+    """
+    if not skipped:
+        return
+
+    logger.warning(f"⚠️  LST・NDVIともに取得失敗のため {len(skipped)} 件をアップロード対象から除外します")
+    save_to_csv_backup(skipped, location_id, error_message="LST・NDVIともに取得失敗")
+
+
+def rollback_quietly(connection):
+    """
+    トランザクションをロールバック（接続断などでロールバック自体が失敗しても無視）
+
+    Args:
+        connection: MySQL接続
+    """
+    try:
+        connection.rollback()
+    except MySQLdb.Error as e:
+        logger.warning(f"⚠️  ロールバック失敗: {e}")
+
+
+def insert_observations(connection, rows):
+    """
+    observations テーブルに複数行をまとめて挿入
+
+    executemanyは単一VALUES句のINSERT文を複数行VALUESに書き換えて
+    送信するため、全行を1回（max_stmt_length超過時は数回）の往復で挿入できる
+    複数文に分割された場合も含め、バッチ全体を1トランザクションとして
+    成功時にCOMMIT、失敗時にROLLBACKする
+
+    location_id の存在確認は事前のSELECTではなく外部キー制約に任せる
+
+    Args:
+        connection: MySQL接続
+        rows: (location_id, observation_date, lst, ndvi) のタプルのリスト
 
     Returns:
         bool: 成功したかどうか
+
+    Raises:
+        ValueError: location_id が locations テーブルに存在しない場合
+        MySQLdb.OperationalError: 送信中に接続が切断された場合
     """
     try:
         with connection.cursor() as cursor:
-            sql = """
-                INSERT INTO observations (
-                    location_id,
-                    observation_date,
-                    lst,
-                    ndvi
-                ) VALUES (
-                    %s, %s, %s, %s
-                )
-                ON DUPLICATE KEY UPDATE
-                    lst = VALUES(lst),
-                    ndvi = VALUES(ndvi)
-            """
-
-            cursor.execute(sql, (
-                location_id,
-                observation['observation_date'],
-                observation['lst'],
-                observation['ndvi']
-            ))
-
-            connection.commit()
-
-            # INSERT か UPDATE かを判定
-            if cursor.rowcount == 1:
-                print(f"✓ 新規データ挿入: {observation['observation_date']}")
-            elif cursor.rowcount == 2:
-                print(f"✓ データ更新: {observation['observation_date']}")
-            else:
-                print(f"⚠️  データに変更なし: {observation['observation_date']}")
+            cursor.executemany(INSERT_OBSERVATIONS_SQL, rows)
 
-            return True
+            # 影響行数は 新規挿入=1行, 更新=2行 として数えられる
+            logger.info(f"✓ {len(rows)} 件を送信（影響行数: {cursor.rowcount}）")
 
-    except pymysql.Error as e:
-        print(f"✗ データ挿入エラー: {e}", file=sys.stderr)
-        connection.rollback()
+        connection.commit()
+        return True
+
+    except MySQLdb.IntegrityError as e:
+        rollback_quietly(connection)
+        if e.args and e.args[0] == FK_VIOLATION_ERRNO:
+            raise ValueError(f"観測地点が存在しません（外部キー制約違反）: {e}") from e
+        logger.error(f"✗ データ挿入エラー: {e}")
+        return False
+
+    except MySQLdb.Error as e:
+        rollback_quietly(connection)
+        # 接続断は呼び出し側で再接続・再試行できるよう送出する
+        if is_connection_lost(e):
+            raise
+        logger.error(f"✗ データ挿入エラー: {e}")
         return False
 
 
-def save_to_csv_backup(observation, location_id, error_message=None):
+def save_to_csv_backup(observations, location_id, error_message=None):
     """
     エラー時にCSVバックアップを保存
 
+    バックアップファイルは1日1ファイル（backup_YYYYMMDD.csv）とし、
+    全観測データを1回の writerows でまとめて追記する
+
     Args:
-        observation: 観測データ
+        observations: 観測データのリスト
         location_id: 観測地点ID
         error_message: エラーメッセージ
     """
     ensure_backup_directory()
 
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_file = BACKUP_DIR / f"backup_{timestamp}.csv"
+    backup_file = BACKUP_DIR / f"backup_{datetime.now():%Y%m%d}.csv"
 
-    fieldnames = ['location_id', 'observation_date', 'lst', 'ndvi', 'error']
+    rows = [
+        {
+            'location_id': location_id,
+            'observation_date': observation['observation_date'],
+            'lst': observation['lst'],
+            'ndvi': observation['ndvi'],
+            'error': error_message or ''
+        }
+        for observation in observations
+    ]
 
     # CSVに書き込み
     file_exists = backup_file.exists()
 
-    with open(backup_file, 'a', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+    with open(backup_file, 'a', buffering=1 << 20, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=BACKUP_FIELDNAMES)
 
         if not file_exists:
             writer.writeheader()
 
-        writer.writerow({
-            'location_id': location_id,
-            'observation_date': observation['observation_date'],
-            'lst': observation['lst'],
-            'ndvi': observation['ndvi'],
-            'error': error_message or ''
-        })
+        writer.writerows(rows)
 
-    print(f"✓ CSVバックアップ保存: {backup_file}")
+    logger.info(f"✓ CSVバックアップ保存: {backup_file}（{len(rows)} 件）")
 
 
 def verify_location_exists(connection, location_id):
@@ -272,68 +648,218 @@ def verify_location_exists(connection, location_id):
             result = cursor.fetchone()
 
             if result:
-                print(f"✓ 観測地点確認: ID={result['id']}, 名前={result['name']}")
+                logger.info(f"✓ 観測地点確認: ID={result['id']}, 名前={result['name']}")
                 return True
             else:
-                print(f"⚠️  観測地点が見つかりません: ID={location_id}", file=sys.stderr)
+                logger.warning(f"⚠️  観測地点が見つかりません: ID={location_id}")
                 return False
 
-    except pymysql.Error as e:
-        print(f"✗ 観測地点確認エラー: {e}", file=sys.stderr)
+    except MySQLdb.Error as e:
+        logger.error(f"✗ 観測地点確認エラー: {e}")
         return False
 
 
+def load_observations(input_paths):
+    """
+    JSONファイル群から観測データを読み込み、抽出結果を表示
+
+    ファイル読み込みと解析はスレッドで並列に行い、結果の表示は入力順に行う
+    読み込めなかったファイルはログに記録して読み飛ばす
+
+    Args:
+        input_paths: JSONファイルパスのリスト
+
+    Returns:
+        tuple: (観測データのリスト, 読み込めなかったファイル数)
+    """
+    if not input_paths:
+        return [], 0
+
+    observations = []
+    failed = 0
+
+    def load(input_path):
+        try:
+            return load_observation(input_path), None
+        except Exception as e:
+            return None, e
+
+    # JSONデータ読み込み・観測データ抽出
+    max_workers = min(MAX_LOAD_WORKERS, len(input_paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(load, input_paths))
+
+    for input_path, (observation, error) in zip(input_paths, loaded):
+        if error is not None:
+            logger.error(f"✗ JSON読み込みエラー: {input_path}: {error}")
+            failed += 1
+            continue
+
+        observations.append(observation)
+
+        logger.info(f"✓ JSONファイル読み込み成功: {input_path}")
+        logger.info(f"\n📊 抽出データ:")
+        logger.info(f"   観測日: {observation['observation_date']}")
+        logger.info(f"   LST: {observation['lst']:.2f}°C" if observation['lst'] else "   LST: 取得失敗")
+        logger.info(f"   NDVI: {observation['ndvi']:.3f}" if observation['ndvi'] else "   NDVI: 取得失敗")
+
+    return observations, failed
+
+
+def run_daemon(connection, location_id):
+    """
+    標準入力から1行ずつJSONファイルパスを受け取り、同じ接続でアップロードし続ける
+
+    EOFで終了する。各行はファイル・ディレクトリ・globパターンのいずれでもよい
+    送信前にpingで接続を確認し、切断されていれば再接続する
+
+    Args:
+        connection: MySQL接続
+        location_id: 観測地点ID
+
+    Returns:
+        tuple: (アップロードに成功した観測データ数, 読み込めなかったファイル・破棄した観測データの数,
+                最終的なMySQL接続。再接続失敗中はNone)
+    """
+    uploaded = 0
+    discarded = 0
+
+    for line in sys.stdin:
+        item = line.strip()
+        if not item:
+            continue
+
+        input_paths = resolve_input_paths([item])
+        if not input_paths:
+            logger.warning(f"⚠️  入力JSONファイルが見つかりません: {item}")
+            continue
+
+        observations, failed = load_observations(input_paths)
+        discarded += failed
+        if not observations:
+            continue
+
+        dated = drop_undated_observations(observations)
+        discarded += len(observations) - len(dated)
+        observations = dated
+
+        try:
+            observations, skipped = filter_observations(observations)
+            backup_skipped_observations(skipped, location_id)
+            if not observations:
+                continue
+
+            rows = [
+                (location_id, observation['observation_date'], observation['lst'], observation['ndvi'])
+                for observation in observations
+            ]
+            # 再接続に失敗した場合は connection を None のままにし、次のバッチで接続し直す
+            if not is_connection_alive(connection):
+                close_quietly(connection)
+                connection = None
+                connection = connect_to_mysql(get_mysql_config())
+
+            try:
+                success = insert_observations(connection, rows)
+            except MySQLdb.OperationalError as e:
+                if not is_connection_lost(e):
+                    raise
+                # 送信中の切断は再接続して1回だけ再試行（未COMMIT分はロールバック済み）
+                logger.warning(f"⚠️  送信中にMySQL接続が切断されました。再接続して再試行します: {e}")
+                close_quietly(connection)
+                connection = None
+                connection = connect_to_mysql(get_mysql_config())
+                success = insert_observations(connection, rows)
+
+            if not success:
+                raise RuntimeError("データ挿入に失敗しました")
+            uploaded += len(rows)
+        except (ValueError, RuntimeError, MySQLdb.Error) as e:
+            logger.error(f"✗ {e}")
+            logger.info("\n📁 CSVバックアップに保存します")
+            save_to_csv_backup(observations, location_id, error_message=str(e))
+
+    return uploaded, discarded, connection
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="collect_data.py のJSON出力をMySQLにアップロード"
     )
-    parser.add_argument("--input", type=str, required=True,
-                       help="入力JSONファイル（collect_data.pyの出力）")
+    parser.add_argument("--input", type=str, nargs='+', default=[],
+                       help="入力JSONファイル（collect_data.pyの出力）。複数ファイル・ディレクトリ・globパターン指定可")
     parser.add_argument("--location-id", type=int, required=True,
                        help="観測地点ID（locationsテーブルのid）")
     parser.add_argument("--backup-only", action="store_true",
                        help="MySQLへのアップロードをスキップし、CSVバックアップのみ保存")
+    parser.add_argument("--verify-location", action="store_true",
+                       help="アップロード前に観測地点の存在をSELECTで確認（デバッグ用）")
+    parser.add_argument("--daemon", action="store_true",
+                       help="MySQL接続を維持したまま、標準入力から1行ずつJSONファイルパスを受け取って処理")
+    parser.add_argument("--quiet", action="store_true",
+                       help="警告・エラーのみ出力（バッチ処理向け）")
 
     args = parser.parse_args()
 
-    print("\n" + "=" * 70)
-    print("MySQL Upload Script")
-    print("=" * 70)
-    print(f"入力ファイル: {args.input}")
-    print(f"観測地点ID: {args.location_id}")
-    print(f"バックアップのみ: {args.backup_only}")
-    print("=" * 70)
+    configure_logging(args.quiet)
+
+    if not args.input and not args.daemon:
+        parser.error("--input または --daemon を指定してください")
+    if args.daemon and args.backup_only:
+        parser.error("--daemon と --backup-only は同時に指定できません")
+
+    input_paths = resolve_input_paths(args.input)
+
+    logger.info("\n" + "=" * 70)
+    logger.info("MySQL Upload Script")
+    logger.info("=" * 70)
+    logger.info(f"入力ファイル: {len(input_paths)} 件")
+    for input_path in input_paths:
+        logger.info(f"   - {input_path}")
+    logger.info(f"観測地点ID: {args.location_id}")
+    logger.info(f"バックアップのみ: {args.backup_only}")
+    logger.info(f"デーモンモード: {args.daemon}")
+    logger.info("=" * 70)
 
     try:
-        # JSONデータ読み込み
-        json_data = load_json_data(args.input)
+        if args.input and not input_paths:
+            raise FileNotFoundError(f"入力JSONファイルが見つかりません: {' '.join(args.input)}")
 
-        # 観測データ抽出
-        observation = extract_observation_data(json_data)
+        observations, failed = load_observations(input_paths)
 
-        print(f"\n📊 抽出データ:")
-        print(f"   観測日: {observation['observation_date']}")
-        print(f"   LST: {observation['lst']}°C" if observation['lst'] else "   LST: 取得失敗")
-        print(f"   NDVI: {observation['ndvi']}" if observation['ndvi'] else "   NDVI: 取得失敗")
+        # 観測日の無い観測データは破棄（アップロードもCSVからの再取り込みもできない）
+        dated = drop_undated_observations(observations)
+        discarded = failed + len(observations) - len(dated)
+        observations = dated
 
         # バックアップのみモード
         if args.backup_only:
-            print("\n📁 CSVバックアップモード")
-            save_to_csv_backup(observation, args.location_id)
-            print("\n✓ バックアップ完了")
+            logger.info("\n📁 CSVバックアップモード")
+            save_to_csv_backup(observations, args.location_id)
+            logger.info("\n✓ バックアップ完了")
+            exit_if_discarded(discarded)
+            return
+
+        # アップロード対象の選別（DB接続前に行う）
+        observations, skipped = filter_observations(observations)
+        backup_skipped_observations(skipped, args.location_id)
+
+        if not observations and not args.daemon:
+            logger.info("\n✓ アップロード対象の観測データがありません")
+            exit_if_discarded(discarded)
             return
 
         # MySQL接続設定取得
         mysql_config = get_mysql_config()
 
-        # pymysqlチェック
-        if not PYMYSQL_AVAILABLE:
-            print("\n❌ エラー: pymysqlが必要です", file=sys.stderr)
-            print("   pip install pymysql でインストールしてください", file=sys.stderr)
+        # MySQLドライバチェック
+        if not import_mysql_driver():
+            logger.error("\n❌ エラー: mysqlclientが必要です")
+            logger.error("   pip install mysqlclient でインストールしてください")
 
             # CSVバックアップに保存
-            print("\n📁 CSVバックアップに保存します")
-            save_to_csv_backup(observation, args.location_id, error_message="pymysql未インストール")
+            logger.info("\n📁 CSVバックアップに保存します")
+            save_to_csv_backup(observations, args.location_id, error_message="mysqlclient未インストール")
             sys.exit(1)
 
         # MySQL接続
@@ -341,37 +867,56 @@ def main():
         try:
             connection = connect_to_mysql(mysql_config)
 
-            # 観測地点存在確認
-            if not verify_location_exists(connection, args.location_id):
+            # 観測地点存在確認（通常は外部キー制約に任せて省略）
+            if args.verify_location and not verify_location_exists(connection, args.location_id):
                 raise ValueError(f"観測地点ID={args.location_id} が存在しません")
 
-            # データ挿入
-            print(f"\n📤 MySQLにアップロード中...")
-            success = insert_observation(connection, args.location_id, observation)
-
-            if success:
-                print("\n✓ アップロード成功")
-            else:
-                raise RuntimeError("データ挿入に失敗しました")
+            # データ挿入（全ファイル分を一括）
+            if observations:
+                logger.info(f"\n📤 MySQLにアップロード中...")
+                rows = [
+                    (args.location_id, observation['observation_date'], observation['lst'], observation['ndvi'])
+                    for observation in observations
+                ]
+                success = insert_observations(connection, rows)
+
+                if success:
+                    logger.info("\n✓ アップロード成功")
+                else:
+                    raise RuntimeError("データ挿入に失敗しました")
+
+            # デーモンモード: 接続を使い回して標準入力のファイルを順次処理
+            if args.daemon:
+                logger.info("\n📡 デーモンモード: 標準入力からJSONファイルパスを待機中（EOFで終了）")
+                try:
+                    uploaded, daemon_discarded, connection = run_daemon(connection, args.location_id)
+                    discarded += daemon_discarded
+                except Exception as e:
+                    # --input 分は挿入済みのため、CSVバックアップには保存しない
+                    logger.error(f"\n✗ デーモンモードエラー: {e}")
+                    sys.exit(1)
+                logger.info(f"\n✓ デーモンモード終了: {uploaded} 件アップロード")
 
         except Exception as e:
-            print(f"\n✗ MySQL処理エラー: {e}", file=sys.stderr)
-            print("\n📁 CSVバックアップに保存します")
-            save_to_csv_backup(observation, args.location_id, error_message=str(e))
+            logger.error(f"\n✗ MySQL処理エラー: {e}")
+            logger.info("\n📁 CSVバックアップに保存します")
+            save_to_csv_backup(observations, args.location_id, error_message=str(e))
             sys.exit(1)
 
         finally:
             if connection:
                 connection.close()
-                print("✓ MySQL接続クローズ")
+                logger.info("✓ MySQL接続クローズ")
 
     except Exception as e:
-        print(f"\n✗ 致命的なエラー: {e}", file=sys.stderr)
+        logger.error(f"\n✗ 致命的なエラー: {e}")
         sys.exit(1)
 
-    print("\n" + "=" * 70)
-    print("✓ 処理完了")
-    print("=" * 70)
+    exit_if_discarded(discarded)
+
+    logger.info("\n" + "=" * 70)
+    logger.info("✓ 処理完了")
+    logger.info("=" * 70)
 
 
 if __name__ == "__main__":